@@ -0,0 +1,254 @@
+"""
+Clinical analytics over AI consultation outcomes.
+
+Each consultation is stored in `consultations` and folded into small
+pre-aggregated rollup documents in `analytics_rollups` with `$inc` upserts:
+
+    condition   per day / ward / doctor / condition: count, confidence_sum
+    confidence  per condition / 1%-wide confidence bucket: count
+    severity    per day / patient severity: count
+
+Failed inferences are stored with status "failed" and never rolled up.
+Analytics endpoints read only these rollups. Rebuild them from history with:
+    python -m backend.analytics --recompute
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+ROLLUPS = "analytics_rollups"
+RECOMPUTE_BATCH_SIZE = 5000
+NO_WARD = "Outpatient"
+# predict_image() fallbacks; these are not clinical findings
+NON_DIAGNOSTIC_CONDITIONS = {"AI Model Unavailable", "Analysis Failed"}
+ROLLUP_FILTER = {"status": {"$ne": "failed"}}
+ROLLUP_FIELDS = {"day": 1, "ward": 1, "doctor_id": 1, "condition": 1, "confidence": 1, "severity": 1}
+
+
+def parse_confidence(value):
+    """'92.34%' -> 92.34 (predict_image returns a formatted string)."""
+    try:
+        return float(str(value).rstrip("%"))
+    except ValueError:
+        return 0.0
+
+
+def rollup_increments(c):
+    """Yields (rollup_id, dims, increments) for one consultation document."""
+    day = c["day"]
+    yield (
+        f"condition|{day}|{c['ward']}|{c['doctor_id']}|{c['condition']}",
+        {"kind": "condition", "day": day, "ward": c["ward"], "doctor_id": c["doctor_id"], "condition": c["condition"]},
+        {"count": 1, "confidence_sum": c["confidence"]}
+    )
+    bucket = int(c["confidence"])
+    yield (
+        f"confidence|{c['condition']}|{bucket}",
+        {"kind": "confidence", "condition": c["condition"], "bucket": bucket},
+        {"count": 1}
+    )
+    yield (
+        f"severity|{day}|{c['severity']}",
+        {"kind": "severity", "day": day, "severity": c["severity"]},
+        {"count": 1}
+    )
+
+
+def rollup_ops(consultations):
+    """Merges increments for a batch in memory, then emits one upsert per touched rollup."""
+    merged = {}
+    for c in consultations:
+        if c.get("status") == "failed":
+            continue
+        for _id, dims, inc in rollup_increments(c):
+            if _id not in merged:
+                merged[_id] = (dims, defaultdict(int))
+            for k, v in inc.items():
+                merged[_id][1][k] += v
+    return [
+        UpdateOne({"_id": _id}, {"$setOnInsert": dims, "$inc": dict(inc)}, upsert=True)
+        for _id, (dims, inc) in merged.items()
+    ]
+
+
+async def ensure_analytics_indexes(database):
+    await database.db[ROLLUPS].create_index([("kind", 1), ("day", 1)], name="kind_1_day_1")
+    await database.get_consultations_collection().create_index("created_at", name="created_at_1")
+
+
+def as_object_id(value):
+    return ObjectId(value) if ObjectId.is_valid(value) else value
+
+
+async def patient_ward(database, patient):
+    bed_id = patient.get("assigned_bed_id")
+    if not bed_id:
+        return NO_WARD
+    bed = await database.get_beds_collection().find_one({"_id": as_object_id(bed_id)}, {"ward": 1})
+    return bed["ward"] if bed else NO_WARD
+
+
+async def record_consultation(database, consultation):
+    """Stores one consultation and updates rollups. Returns the inserted id."""
+    consultations = database.get_consultations_collection()
+    res = await consultations.insert_one(consultation)
+    ops = rollup_ops([consultation])
+    if ops:
+        await database.db[ROLLUPS].bulk_write(ops, ordered=False)
+        # Marks the increments as applied, which recompute_rollups() relies on
+        await consultations.update_one({"_id": res.inserted_id}, {"$set": {"rolled_up": True}})
+    return res.inserted_id
+
+
+def build_consultation(patient_id, doctor_id, appointment_id, patient, ward, condition, confidence, plan):
+    now = datetime.now(timezone.utc)
+    return {
+        "patient_id": patient_id,
+        "doctor_id": doctor_id,
+        "appointment_id": appointment_id,
+        "status": "failed" if condition in NON_DIAGNOSTIC_CONDITIONS else "completed",
+        "condition": condition,
+        "confidence": parse_confidence(confidence),
+        "severity": patient.get("severity", "Unknown"),
+        "ward": ward,
+        "ai_treatment_plan": plan,
+        "created_at": now,
+        "day": now.date().isoformat()
+    }
+
+
+# --- Readers (rollups only) ---
+
+def _day_filter(kind, start=None, end=None):
+    query = {"kind": kind}
+    if start or end:
+        query["day"] = {}
+        if start:
+            query["day"]["$gte"] = start
+        if end:
+            query["day"]["$lte"] = end
+    return query
+
+
+async def condition_summary(database, start=None, end=None, ward=None, doctor_id=None):
+    query = _day_filter("condition", start, end)
+    if ward:
+        query["ward"] = ward
+    if doctor_id:
+        query["doctor_id"] = doctor_id
+    totals = defaultdict(lambda: {"count": 0, "confidence_sum": 0.0})
+    async for r in database.db[ROLLUPS].find(query):
+        t = totals[r["condition"]]
+        t["count"] += r["count"]
+        t["confidence_sum"] += r["confidence_sum"]
+    summary = [
+        {"condition": k, "count": int(v["count"]), "avg_confidence": round(v["confidence_sum"] / v["count"], 2)}
+        for k, v in totals.items() if v["count"]
+    ]
+    summary.sort(key=lambda s: -s["count"])
+    return summary
+
+
+async def confidence_distribution(database, condition=None):
+    query = {"kind": "confidence"}
+    if condition:
+        query["condition"] = condition
+    buckets = defaultdict(int)
+    async for r in database.db[ROLLUPS].find(query):
+        buckets[r["bucket"]] += int(r["count"])
+    return [{"bucket": f"{b}-{b + 1}%", "count": buckets[b]} for b in sorted(buckets)]
+
+
+async def severity_trend(database, start=None, end=None):
+    days = defaultdict(dict)
+    async for r in database.db[ROLLUPS].find(_day_filter("severity", start, end)):
+        days[r["day"]][r["severity"]] = int(r["count"])
+    return [{"day": d, **days[d]} for d in sorted(days)]
+
+
+# --- Backfill / recompute ---
+
+async def _last_consultation_id(database):
+    last = await database.get_consultations_collection().find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    return last["_id"] if last else None
+
+
+def _id_range(after=None, upto=None):
+    bounds = {}
+    if after is not None:
+        bounds["$gt"] = after
+    if upto is not None:
+        bounds["$lte"] = upto
+    return {**ROLLUP_FILTER, "_id": bounds} if bounds else dict(ROLLUP_FILTER)
+
+
+async def _stream_rollups(database, target, query, batch_size):
+    batch, total = [], 0
+    cursor = database.get_consultations_collection().find(query, ROLLUP_FIELDS).sort("_id", 1).batch_size(batch_size)
+    async for c in cursor:
+        batch.append(c)
+        if len(batch) >= batch_size:
+            await target.bulk_write(rollup_ops(batch), ordered=False)
+            total += len(batch)
+            batch = []
+    if batch:
+        await target.bulk_write(rollup_ops(batch), ordered=False)
+        total += len(batch)
+    return total
+
+
+async def recompute_rollups(database, batch_size=RECOMPUTE_BATCH_SIZE):
+    """
+    Rebuilds rollups from consultation history in streaming batches into a
+    staging collection, then swaps it in with a single rename.
+
+    History is read up to a high-water `_id` captured first. Consultations
+    recorded while the rebuild runs update the live rollups that the rename
+    discards, so those between that mark and a second mark taken just before
+    the swap are replayed into the new rollups, but only once flagged
+    `rolled_up`: an unflagged one still has its live write pending, which
+    will land in the new rollups. The flag is read after the rename, so a
+    write completing in the few milliseconds around the swap can still be
+    counted twice or missed; pause writes for an exact rebuild.
+    """
+    staging = database.db[f"{ROLLUPS}_rebuild"]
+    await staging.drop()
+    start_mark = await _last_consultation_id(database)
+    if start_mark is None:
+        await database.db[ROLLUPS].drop()
+        await ensure_analytics_indexes(database)
+        return 0
+    total = await _stream_rollups(database, staging, _id_range(upto=start_mark), batch_size)
+
+    swap_mark = await _last_consultation_id(database)
+    if total:
+        await staging.rename(ROLLUPS, dropTarget=True)
+    else:
+        await database.db[ROLLUPS].drop()
+    replay = {**_id_range(after=start_mark, upto=swap_mark), "rolled_up": True}
+    total += await _stream_rollups(database, database.db[ROLLUPS], replay, batch_size)
+    await ensure_analytics_indexes(database)
+    return total
+
+
+async def _main(args):
+    from backend.database import db
+    await db.connect_async()
+    try:
+        start = time.perf_counter()
+        n = await recompute_rollups(db, args.batch_size)
+        print(f"Recomputed rollups from {n} consultations in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild clinical analytics rollups.")
+    parser.add_argument("--recompute", action="store_true", required=True, help="Rebuild rollups from consultation history")
+    parser.add_argument("--batch-size", type=int, default=RECOMPUTE_BATCH_SIZE)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,180 @@
+"""
+CPU budgeting between the event loop and model inference.
+
+Cores are split into a request-handling share (left to the asyncio event
+loop / uvicorn) and an inference share. Inference runs on a dedicated
+thread pool; each worker pins torch's intra-op thread count so concurrent
+calls stop oversubscribing the CPU.
+
+Configuration (environment):
+    REQUEST_CORES          cores reserved for request handling (default 1)
+    INFERENCE_WORKERS      concurrent inference calls (default: derived)
+    TORCH_THREADS          torch intra-op threads per worker (default: derived)
+    TORCH_INTEROP_THREADS  torch inter-op threads (default 1)
+    CPU_AUTOTUNE           "1" to sweep configurations on startup
+"""
+import asyncio
+import functools
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+from PIL import Image
+
+MAX_THREADS_PER_WORKER = 4  # ResNet18 on a single image stops scaling around here
+
+
+class AutotuneInProgress(RuntimeError):
+    pass
+
+
+def candidate_layouts(inference_cores):
+    """(workers, threads) pairs that exactly fill `inference_cores`, one per divisor."""
+    return [(inference_cores // t, t) for t in range(1, inference_cores + 1) if inference_cores % t == 0]
+
+
+def default_layout(inference_cores, workers=0, threads=0):
+    """
+    Fills in whichever of `workers` / `threads` is unset (0). With neither
+    set, picks the most threads per worker up to MAX_THREADS_PER_WORKER that
+    still uses every inference core, e.g. 7 cores -> 7x1, 8 -> 2x4, 6 -> 2x3.
+    """
+    if workers and threads:
+        return workers, threads
+    if threads:
+        return max(1, inference_cores // threads), threads
+    if workers:
+        return workers, max(1, inference_cores // workers)
+    threads = max(t for _, t in candidate_layouts(inference_cores) if t <= MAX_THREADS_PER_WORKER)
+    return inference_cores // threads, threads
+
+
+def _init_worker(threads):
+    # omp/native thread counts are per calling thread, so set them in each worker
+    torch.set_num_threads(threads)
+
+
+def _sample_image_bytes(size=256):
+    img = Image.new("RGB", (size, size))
+    img.putdata([(x % 256, y % 256, (x * y) % 256) for y in range(size) for x in range(size)])
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class InferenceScheduler:
+    def __init__(self):
+        self.total_cores = os.cpu_count() or 1
+        self.request_cores = min(int(os.getenv("REQUEST_CORES", "1")), self.total_cores - 1)
+        self.inference_cores = max(1, self.total_cores - self.request_cores)
+        self.autotune_on_startup = os.getenv("CPU_AUTOTUNE", "0") == "1"
+        self.last_autotune = None
+        self._lock = threading.Lock()  # Guards executor swap vs. submit
+        self._autotune_lock = threading.Lock()
+
+        workers, threads = default_layout(
+            self.inference_cores,
+            workers=int(os.getenv("INFERENCE_WORKERS", "0")),
+            threads=int(os.getenv("TORCH_THREADS", "0"))
+        )
+
+        # Inter-op threads can only be set once, before any parallel work runs
+        try:
+            torch.set_num_interop_threads(int(os.getenv("TORCH_INTEROP_THREADS", "1")))
+        except RuntimeError as e:
+            print(f"Could not set torch inter-op threads: {e}")
+
+        self.executor = None
+        self.configure(workers, threads)
+
+    def configure(self, workers, threads):
+        """Swaps in a new inference pool; in-flight calls finish on the old one."""
+        with self._lock:
+            old = self.executor
+            self.workers = workers
+            self.threads = threads
+            torch.set_num_threads(threads)
+            self.executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="inference",
+                initializer=_init_worker,
+                initargs=(threads,)
+            )
+        if old:
+            old.shutdown(wait=False)
+        print(f"Inference CPU budget: {workers} worker(s) x {threads} torch thread(s), "
+              f"{self.request_cores}/{self.total_cores} core(s) reserved for requests")
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs a blocking inference call on the inference pool, off the event loop."""
+        loop = asyncio.get_running_loop()
+        # Submit under the lock so configure() can't shut this executor down in between
+        with self._lock:
+            future = loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+        return await future
+
+    def candidates(self):
+        """(workers, threads) pairs that exactly fill the inference share, plus the current one."""
+        configs = candidate_layouts(self.inference_cores)
+        if (self.workers, self.threads) not in configs:
+            configs.append((self.workers, self.threads))
+        return configs
+
+    def _measure(self, fn, sample, workers, threads, requests):
+        ex = ThreadPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads,))
+        try:
+            list(ex.map(lambda _: fn(sample), range(workers)))  # Warm-up, one call per worker
+            start = time.perf_counter()
+            list(ex.map(lambda _: fn(sample), range(requests)))
+            return requests / (time.perf_counter() - start)
+        finally:
+            ex.shutdown(wait=True)
+
+    def autotune(self, fn, requests_per_config=None):
+        """
+        Sweeps candidate configurations with `fn(image_bytes)` and applies the
+        highest-throughput one. Blocking; call via asyncio.to_thread. Results
+        are skewed if live traffic is running, so prefer startup or quiet periods.
+        Raises AutotuneInProgress if another sweep is already running.
+        """
+        if not self._autotune_lock.acquire(blocking=False):
+            raise AutotuneInProgress("CPU autotune already running")
+        try:
+            return self._autotune(fn, requests_per_config)
+        finally:
+            self._autotune_lock.release()
+
+    def _autotune(self, fn, requests_per_config):
+        sample = _sample_image_bytes()
+        results = []
+        for workers, threads in self.candidates():
+            n = requests_per_config or max(8, workers * 4)
+            rps = self._measure(fn, sample, workers, threads, n)
+            results.append({"workers": workers, "threads": threads, "throughput_rps": round(rps, 2)})
+            print(f"Autotune: {workers} worker(s) x {threads} thread(s) -> {rps:.2f} inferences/s")
+        best = max(results, key=lambda r: r["throughput_rps"])
+        self.configure(best["workers"], best["threads"])
+        self.last_autotune = {"results": results, "selected": best}
+        return self.last_autotune
+
+    def config(self):
+        return {
+            "autotune_running": self._autotune_lock.locked(),
+            "total_cores": self.total_cores,
+            "request_cores": self.request_cores,
+            "inference_cores": self.inference_cores,
+            "workers": self.workers,
+            "torch_threads_per_worker": self.threads,
+            "torch_interop_threads": torch.get_num_interop_threads(),
+            "last_autotune": self.last_autotune
+        }
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False)
+
+
+inference_scheduler = InferenceScheduler()
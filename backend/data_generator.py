@@ -0,0 +1,301 @@
+"""
+Synthetic hospital dataset generator.
+
+Writes large volumes of patients, doctors, beds and appointment histories
+using batched bulk writes, either straight into MongoDB or into NDJSON files
+(Extended JSON, importable with `mongoimport`) as a local stand-in.
+
+Examples:
+    python -m backend.data_generator --patients 1000000 --doctors 2000 --beds 5000
+    python -m backend.data_generator --patients 50000 --out ./synthetic_data
+    python -m backend.data_generator --severity-mix Normal=0.6,Serious=0.3,Critical=0.1 --drop
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from bson import ObjectId
+from bson import json_util
+from pymongo import MongoClient
+
+from backend.database import MONGO_URI, DB_NAME
+from backend.search import search_keys
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Aarav", "Priya",
+               "Wei", "Mei", "Carlos", "Sofia", "Ahmed", "Fatima", "Ivan", "Olga", "Kenji", "Yuki"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Wilson", "Anderson", "Taylor", "Thomas", "Moore", "Jackson", "Sharma", "Patel",
+              "Chen", "Wang", "Kim", "Nguyen", "Khan", "Ali", "Petrov", "Ivanova", "Tanaka", "Sato"]
+ALLERGIES = ["None", "Penicillin", "Amoxicillin", "NSAID", "Ibuprofen", "Lisinopril", "Sulfa", "Latex", "Aspirin"]
+SPECIALIZATIONS = ["General", "Cardiology", "Pulmonology", "Orthopedics", "Oncology", "Neurology", "Pediatrics", "Radiology"]
+AVAILABILITY = ["Mon-Fri", "Mon-Wed", "Thu-Sun", "Weekends", "24/7 On-Call"]
+APPOINTMENT_STATUSES = {"Completed": 0.7, "Scheduled": 0.2, "Cancelled": 0.1}
+
+DEFAULT_SEVERITY_MIX = {"Normal": 0.8, "Serious": 0.15, "Critical": 0.05}
+DEFAULT_WARD_MIX = {"General": 0.75, "ICU": 0.25}
+# Mirrors add_patient(): Critical -> ICU (fallback General), Serious -> General
+DEFAULT_SEVERITY_WARDS = {"Critical": ["ICU", "General"], "Serious": ["General"]}
+
+COLLECTIONS = ["patients", "doctors", "beds", "appointments"]
+
+
+def parse_mix(text):
+    """Parses 'A=0.7,B=0.3' into a normalised {label: weight} dict."""
+    mix = {}
+    for part in text.split(","):
+        label, _, weight = part.partition("=")
+        if not label.strip() or not weight:
+            raise argparse.ArgumentTypeError(f"Invalid mix entry '{part}', expected LABEL=WEIGHT")
+        mix[label.strip()] = float(weight)
+    total = sum(mix.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("Mix weights must sum to a positive number")
+    return {k: v / total for k, v in mix.items()}
+
+
+def parse_severity_wards(text):
+    """Parses 'Critical=ICU|General,Serious=General' into {severity: [ward, ...]} (in preference order)."""
+    mapping = {}
+    for part in text.split(","):
+        severity, _, wards = part.partition("=")
+        wards = [w.strip() for w in wards.split("|") if w.strip()]
+        if not severity.strip() or not wards:
+            raise argparse.ArgumentTypeError(f"Invalid mapping entry '{part}', expected SEVERITY=WARD[|WARD...]")
+        mapping[severity.strip()] = wards
+    return mapping
+
+
+class MongoWriter:
+    """Bulk-inserts batches into MongoDB (unordered, so one bad doc doesn't stop the batch)."""
+
+    def __init__(self, uri, db_name, drop=False):
+        self.client = MongoClient(uri)
+        self.db = self.client[db_name]
+        if drop:
+            for name in COLLECTIONS:
+                self.db[name].delete_many({"synthetic": True})
+        elif any(self.db[name].find_one({"synthetic": True}, {"_id": 1}) for name in COLLECTIONS):
+            self.client.close()
+            raise RuntimeError(f"Synthetic data already exists in '{db_name}'; rerun with --drop to replace it")
+
+    def write(self, collection, docs):
+        if docs:
+            self.db[collection].insert_many(docs, ordered=False)
+
+    def close(self):
+        self.client.close()
+
+
+class JsonlWriter:
+    """Local stand-in: writes batches to <out>/<collection>.jsonl in Extended JSON."""
+
+    def __init__(self, out_dir, drop=False):
+        os.makedirs(out_dir, exist_ok=True)
+        paths = {name: os.path.join(out_dir, f"{name}.jsonl") for name in COLLECTIONS}
+        if not drop and any(os.path.exists(p) and os.path.getsize(p) for p in paths.values()):
+            raise RuntimeError(f"Synthetic data already exists in '{out_dir}'; rerun with --drop to replace it")
+        self.files = {name: open(path, "w", encoding="utf-8") for name, path in paths.items()}
+
+    def write(self, collection, docs):
+        if docs:
+            self.files[collection].write("".join(json_util.dumps(d) + "\n" for d in docs))
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+class DatasetGenerator:
+    def __init__(self, writer, batch_size=5000, seed=None,
+                 severity_mix=None, ward_mix=None, severity_wards=None, appointments_per_patient=2.0, history_days=365):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.severity_mix = severity_mix or DEFAULT_SEVERITY_MIX
+        self.ward_mix = ward_mix or DEFAULT_WARD_MIX
+        if severity_wards is None:
+            # Default mapping adapts to the ward mix instead of failing on absent wards
+            severity_wards = {sev: [w for w in wards if w in self.ward_mix] for sev, wards in DEFAULT_SEVERITY_WARDS.items()}
+        self.severity_wards = severity_wards
+        unknown = {w for wards in self.severity_wards.values() for w in wards} - set(self.ward_mix)
+        if unknown:
+            raise ValueError(f"Severity ward mapping uses wards missing from the ward mix: {', '.join(sorted(unknown))}")
+        unused = set(self.ward_mix) - {w for wards in self.severity_wards.values() for w in wards}
+        if unused:
+            print(f"Warning: no severity maps to ward(s) {', '.join(sorted(unused))}; their beds stay free")
+        self.appointments_per_patient = appointments_per_patient
+        self.history_days = history_days
+        self.doctor_ids = []
+        self.beds = []
+        self.free_beds = {}  # ward -> list of unoccupied bed docs
+        self.counts = {name: 0 for name in COLLECTIONS}
+
+    def _pick(self, mix):
+        return self.rng.choices(list(mix.keys()), weights=list(mix.values()))[0]
+
+    def _flush(self, collection, docs):
+        self.writer.write(collection, docs)
+        self.counts[collection] += len(docs)
+        docs.clear()
+
+    def generate_doctors(self, n):
+        batch = []
+        for i in range(n):
+            _id = f"doc_syn_{i + 1}"
+            self.doctor_ids.append(_id)
+            batch.append({
+                "_id": _id,
+                "name": f"Dr. {self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                "specialization": self.rng.choice(SPECIALIZATIONS),
+                "availability": self.rng.choice(AVAILABILITY),
+                "synthetic": True
+            })
+            if len(batch) >= self.batch_size:
+                self._flush("doctors", batch)
+        self._flush("doctors", batch)
+
+    def generate_beds(self, n):
+        # Beds stay in memory (thousands, not millions) so patients can occupy
+        # them before they are written; no follow-up update pass is needed.
+        for i in range(n):
+            ward = self._pick(self.ward_mix)
+            # Numbered separately from the default B-xx beds so seeding never collides
+            bed = {
+                "_id": ObjectId(),
+                "ward": ward,
+                "number": f"S-{i + 1:06d}",
+                "is_occupied": False,
+                "patient_id": None,
+                "synthetic": True
+            }
+            self.beds.append(bed)
+            self.free_beds.setdefault(ward, []).append(bed)
+
+    def write_beds(self):
+        for i in range(0, len(self.beds), self.batch_size):
+            self._flush("beds", self.beds[i:i + self.batch_size])
+
+    def _assign_bed(self, severity):
+        for ward in self.severity_wards.get(severity, []):
+            if self.free_beds.get(ward):
+                return self.free_beds[ward].pop()
+        return None
+
+    def _appointments_for(self, patient_id, out):
+        if not self.doctor_ids:
+            return
+        # Geometric count with the requested mean keeps a realistic long tail
+        p = 1.0 / (1.0 + self.appointments_per_patient)
+        today = date.today()
+        while self.rng.random() > p:
+            day = today - timedelta(days=self.rng.randint(0, self.history_days))
+            out.append({
+                "patient_id": patient_id,
+                "doctor_id": self.rng.choice(self.doctor_ids),
+                "date": day.isoformat(),
+                "status": self._pick(APPOINTMENT_STATUSES),
+                "ai_analysis_ref": None,
+                "synthetic": True
+            })
+
+    def generate_patients(self, n):
+        patients, appointments = [], []
+        occupied = 0
+        for _ in range(n):
+            _id = ObjectId()
+            severity = self._pick(self.severity_mix)
+            age = self.rng.randint(1, 95)
+            doc = {
+                "_id": _id,
+                "name": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                "age": age,
+                "gender": self.rng.choice(["Male", "Female"]),
+                "contact": f"555-{self.rng.randint(0, 9999):04d}",
+                "weight": round(self.rng.uniform(10.0, 40.0) if age < 12 else self.rng.uniform(45.0, 120.0), 1),
+                "allergies": self.rng.choice(ALLERGIES),
+                "history": "",
+                "severity": severity,
+                "assigned_bed_id": None,
+                "synthetic": True
+            }
+            doc["search_keys"] = search_keys(doc)
+            bed = self._assign_bed(severity)
+            if bed:
+                doc["assigned_bed_id"] = str(bed["_id"])
+                bed["is_occupied"] = True
+                bed["patient_id"] = str(_id)
+                occupied += 1
+            patients.append(doc)
+            self._appointments_for(str(_id), appointments)
+
+            if len(patients) >= self.batch_size:
+                self._flush("patients", patients)
+            if len(appointments) >= self.batch_size:
+                self._flush("appointments", appointments)
+        self._flush("patients", patients)
+        self._flush("appointments", appointments)
+        return occupied
+
+    def run(self, patients, doctors, beds):
+        start = time.perf_counter()
+        self.generate_doctors(doctors)
+        self.generate_beds(beds)
+        occupied = self.generate_patients(patients)
+        self.write_beds()
+        elapsed = time.perf_counter() - start
+        summary = ", ".join(f"{v} {k}" for k, v in self.counts.items())
+        print(f"Generated {summary} ({occupied} beds occupied) in {elapsed:.1f}s")
+        return self.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic large-scale hospital dataset.")
+    parser.add_argument("--patients", type=int, default=100000)
+    parser.add_argument("--doctors", type=int, default=1000)
+    parser.add_argument("--beds", type=int, default=2000)
+    parser.add_argument("--appointments-per-patient", type=float, default=2.0, help="Mean appointments per patient")
+    parser.add_argument("--history-days", type=int, default=365, help="Spread appointment dates over this many past days")
+    parser.add_argument("--severity-mix", type=parse_mix, default=DEFAULT_SEVERITY_MIX, help="e.g. Normal=0.8,Serious=0.15,Critical=0.05")
+    parser.add_argument("--ward-mix", type=parse_mix, default=DEFAULT_WARD_MIX, help="e.g. General=0.75,ICU=0.25")
+    parser.add_argument("--severity-wards", type=parse_severity_wards, default=None,
+                        help="Wards each severity is admitted to, in preference order (default Critical=ICU|General,Serious=General)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=None, help="RNG seed for reproducible datasets")
+    parser.add_argument("--mongo-uri", default=MONGO_URI)
+    parser.add_argument("--db", default=DB_NAME)
+    parser.add_argument("--out", default=None, help="Write NDJSON files to this directory instead of MongoDB")
+    parser.add_argument("--drop", action="store_true", help="Remove previously generated synthetic data first")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.out:
+            writer = JsonlWriter(args.out, drop=args.drop)
+        else:
+            writer = MongoWriter(args.mongo_uri, args.db, drop=args.drop)
+    except RuntimeError as e:
+        parser.error(str(e))
+    try:
+        gen = DatasetGenerator(
+            writer,
+            batch_size=args.batch_size,
+            seed=args.seed,
+            severity_mix=args.severity_mix,
+            ward_mix=args.ward_mix,
+            severity_wards=args.severity_wards,
+            appointments_per_patient=args.appointments_per_patient,
+            history_days=args.history_days
+        )
+    except ValueError as e:
+        writer.close()
+        parser.error(str(e))
+    try:
+        gen.run(args.patients, args.doctors, args.beds)
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
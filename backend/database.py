@@ -54,5 +54,6 @@ class Database:
     def get_inventory_collection(self): return self.db["inventory"]
     def get_beds_collection(self): return self.db["beds"]
     def get_appointments_collection(self): return self.db["appointments"]
+    def get_consultations_collection(self): return self.db["consultations"]
 
 db = Database()
@@ -1,7 +1,6 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Body, Depends
+from fastapi import FastAPI, File, UploadFile, HTTPException, Body, Query
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
 from typing import List, Optional
 from bson import ObjectId
 import os
@@ -9,9 +8,15 @@ import asyncio
 
 # Services
 from backend.database import db
+from backend.models import UserLogin, Patient, Doctor, Appointment
 from backend.ai_service import ai_service
+from backend.cpu_scheduler import inference_scheduler, AutotuneInProgress
+from backend.seeding import seed_defaults
+from backend.search import patient_search, search_keys, ensure_search_index, prefix_search
+from backend import analytics
+from backend.serialization import MongoJSONResponse, projection_for, model_pipeline
 
-app = FastAPI(title="Advanced AI Hospital System (RBAC + Beds)")
+app = FastAPI(title="Advanced AI Hospital System (RBAC + Beds)", default_response_class=MongoJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,80 +26,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Models ---
-class UserLogin(BaseModel):
-    username: str
-    password: str
-
-class User(BaseModel):
-    id: Optional[str] = Field(None, alias="_id")
-    username: str
-    role: str # 'admin', 'doctor', 'patient'
-    linked_id: Optional[str] = None # ID in doctors/patients collection
-
-class Patient(BaseModel):
-    id: Optional[str] = Field(None, alias="_id")
-    name: str
-    age: int
-    gender: str
-    contact: str
-    weight: float
-    allergies: str = "None"
-    history: str = ""
-    severity: str = "Normal" # 'Normal', 'Serious', 'Critical'
-    assigned_bed_id: Optional[str] = None
-
-class Doctor(BaseModel):
-    id: Optional[str] = Field(None, alias="_id")
-    name: str
-    specialization: str
-    availability: str
-
-class Bed(BaseModel):
-    id: Optional[str] = Field(None, alias="_id")
-    ward: str
-    number: str
-    is_occupied: bool = False
-    patient_id: Optional[str] = None
-
-class Appointment(BaseModel):
-    id: Optional[str] = Field(None, alias="_id")
-    patient_id: str
-    doctor_id: str
-    date: str
-    status: str = "Scheduled"
-    ai_analysis_ref: Optional[dict] = None
-
 # --- Startup: Seed Users & Beds ---
 @app.on_event("startup")
 async def startup():
     # Use async connect + ping to ensure DB reachable during startup
     await db.connect_async()
     
-    # Seed Users
-    users_coll = db.get_users_collection()
-    if await users_coll.count_documents({}) == 0:
-        await users_coll.insert_many([
-            {"username": "admin", "password": "admin123", "role": "admin"},
-            {"username": "doctor", "password": "doc123", "role": "doctor", "linked_id": "doc_1"},
-            {"username": "patient", "password": "pat123", "role": "patient", "linked_id": "pat_1"}
-        ])
-        await db.get_doctors_collection().insert_one({"_id": "doc_1", "name": "Dr. Smith", "specialization": "General", "availability": "Mon-Fri"})
-        await db.get_patients_collection().insert_one({"_id": "pat_1", "name": "John Doe", "age": 30, "gender": "Male", "contact": "555-0101", "weight": 75.0, "allergies": "None", "severity": "Normal"})
-        print("Seeded default users.")
-    
-    # Seed Beds (New)
-    beds_coll = db.get_beds_collection()
-    if await beds_coll.count_documents({}) == 0:
-        beds_data = []
-        for i in range(1, 21): # 20 Beds
-            ward = "General" if i <= 15 else "ICU"
-            beds_data.append({"ward": ward, "number": f"B-{i:02d}", "is_occupied": False, "patient_id": None})
-        await beds_coll.insert_many(beds_data)
-        print("Seeded hospital beds.")
+    # Seed defaults (idempotent bulk upsert, safe on every boot)
+    await seed_defaults(db)
+
+    # Search: Mongo prefix index + in-process n-gram index (built in background)
+    await ensure_search_index(db.get_patients_collection())
+    asyncio.create_task(patient_search.build(db.get_patients_collection()))
+
+    await analytics.ensure_analytics_indexes(db)
+
+    # Optional: pick the highest-throughput inference thread layout for this host
+    if inference_scheduler.autotune_on_startup:
+        if not ai_service.model:
+            print("CPU autotune skipped: AI model unavailable")
+        else:
+            # Keep a reference so the task isn't garbage-collected mid-sweep
+            app.state.autotune_task = asyncio.create_task(
+                asyncio.to_thread(inference_scheduler.autotune, ai_service.predict_image)
+            )
+            app.state.autotune_task.add_done_callback(_report_autotune)
+
+def _report_autotune(task):
+    if task.cancelled():
+        return
+    if task.exception():
+        print(f"CPU autotune failed: {task.exception()!r}")
+    else:
+        print(f"CPU autotune selected: {task.result()['selected']}")
 
 @app.on_event("shutdown")
 async def shutdown():
+    inference_scheduler.shutdown()
     db.close()
 
 # --- Health Check ---
@@ -156,17 +124,56 @@ async def get_stats():
 # --- General Routes ---
 
 # Patients
+# Listing routes return MongoJSONResponse directly: Mongo shapes documents like the
+# model (defaults, float coercion), ObjectIds are encoded during serialization and
+# response_model is kept for the schema only (no re-validation).
 @app.get("/api/patients", response_model=List[Patient])
 async def get_patients():
-    patients = []
-    async for p in db.get_patients_collection().find():
-        p["_id"] = str(p["_id"])
-        patients.append(p)
-    return patients
+    patients = await db.get_patients_collection().aggregate(model_pipeline(Patient)).to_list(length=None)
+    return MongoJSONResponse(patients)
+
+@app.get("/api/patients/search")
+async def search_patients(
+    q: str = Query(..., min_length=1),
+    mode: str = "prefix",
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    if mode not in ["prefix", "fuzzy"]:
+        raise HTTPException(status_code=400, detail="mode must be 'prefix' or 'fuzzy'")
+    skip = (page - 1) * limit
+    coll = db.get_patients_collection()
+    if mode == "prefix":
+        results, has_more, truncated = await prefix_search(coll, q, skip, limit, projection_for(Patient))
+    else:
+        ranked, has_more = patient_search.search(q, skip, limit)
+        truncated = False
+        docs = {}
+        if ranked:
+            async for p in coll.aggregate(model_pipeline(Patient, {"_id": {"$in": [i for i, _ in ranked]}})):
+                docs[p["_id"]] = p
+        results = []
+        for _id, score in ranked:
+            if _id in docs:
+                p = docs[_id]
+                p["score"] = round(score, 3)
+                results.append(p)
+
+    return MongoJSONResponse({
+        "query": q,
+        "mode": mode,
+        "page": page,
+        "limit": limit,
+        "has_more": has_more,
+        "truncated": truncated,
+        "index_ready": patient_search.ready if mode == "fuzzy" else True,
+        "results": results
+    })
 
 @app.post("/api/patients")
 async def add_patient(p: Patient):
     new_p = p.dict(exclude={"id"})
+    new_p["search_keys"] = search_keys(new_p)
     
     # Auto-assign bed if Serious/Critical and bed available
     if new_p.get("severity") in ["Serious", "Critical"]:
@@ -183,6 +190,7 @@ async def add_patient(p: Patient):
             await beds_coll.update_one({"_id": free_bed["_id"]}, {"$set": {"is_occupied": True}})
 
     res = await db.get_patients_collection().insert_one(new_p)
+    patient_search.add(res.inserted_id, new_p)
     
     # Update bed with patient ID if assigned
     if new_p.get("assigned_bed_id"):
@@ -191,19 +199,18 @@ async def add_patient(p: Patient):
             {"$set": {"patient_id": str(res.inserted_id)}}
         )
         
-    return {"_id": str(res.inserted_id), **new_p}
+    # insert_one() set new_p["_id"]; the response class encodes the ObjectId
+    new_p.pop("search_keys", None)
+    return MongoJSONResponse(new_p)
 
 # Doctors
 @app.get("/api/doctors", response_model=List[Doctor])
 async def get_doctors():
-    doctors = []
-    async for d in db.get_doctors_collection().find():
-        d["_id"] = str(d["_id"])
-        doctors.append(d)
-    return doctors
+    doctors = await db.get_doctors_collection().aggregate(model_pipeline(Doctor)).to_list(length=None)
+    return MongoJSONResponse(doctors)
 
 # Appointments
-@app.get("/api/appointments")
+@app.get("/api/appointments", response_model=List[Appointment])
 async def get_appointments(role: str, linked_id: Optional[str] = None):
     query = {}
     if role == 'doctor' and linked_id:
@@ -211,24 +218,22 @@ async def get_appointments(role: str, linked_id: Optional[str] = None):
     elif role == 'patient' and linked_id:
         query['patient_id'] = linked_id
     
-    apps = []
-    async for a in db.get_appointments_collection().find(query):
-        a["_id"] = str(a["_id"])
-        apps.append(a)
-    return apps
+    apps = await db.get_appointments_collection().aggregate(model_pipeline(Appointment, query)).to_list(length=None)
+    return MongoJSONResponse(apps)
 
 @app.post("/api/appointments")
 async def create_appointment(a: Appointment):
     new_a = a.dict(exclude={"id"})
-    res = await db.get_appointments_collection().insert_one(new_a)
-    return {"_id": str(res.inserted_id), **new_a}
+    await db.get_appointments_collection().insert_one(new_a)
+    return MongoJSONResponse(new_a)
 
 # AI Consultation
 @app.post("/api/consultation/ai-assist")
 async def consultation_ai_assist(
     file: UploadFile = File(...), 
     patient_id: str = Body(...),
-    doctor_id: str = Body(...)
+    doctor_id: str = Body(...),
+    appointment_id: Optional[str] = Body(None)
 ):
     try:
         p_query = {"_id": patient_id}
@@ -240,8 +245,14 @@ async def consultation_ai_assist(
     except:
         patient = {"age": 30, "weight": 70, "allergies": "None", "name": "Unknown"}
 
+    # Reject unknown appointments before spending inference time
+    appointments = db.get_appointments_collection()
+    if appointment_id and not await appointments.find_one({"_id": analytics.as_object_id(appointment_id)}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Appointment not found")
+
     contents = await file.read()
-    condition, confidence = ai_service.predict_image(contents)
+    # Inference runs on the budgeted CPU pool, keeping the event loop free
+    condition, confidence = await inference_scheduler.run(ai_service.predict_image, contents)
     
     med_plan = ai_service.generate_dosage_recommendation(
         condition=condition,
@@ -249,13 +260,71 @@ async def consultation_ai_assist(
         weight=patient.get("weight", 70.0),
         allergies=patient.get("allergies", "None")
     )
+
+    # Persist outcome + update analytics rollups
+    ward = await analytics.patient_ward(db, patient)
+    consultation = analytics.build_consultation(
+        patient_id, doctor_id, appointment_id, patient, ward, condition, confidence, med_plan
+    )
+    consultation_id = await analytics.record_consultation(db, consultation)
+
+    if appointment_id:
+        res = await appointments.update_one(
+            {"_id": analytics.as_object_id(appointment_id)},
+            {"$set": {"ai_analysis_ref": {
+                "consultation_id": str(consultation_id),
+                "status": consultation["status"],
+                "condition": condition,
+                "confidence": consultation["confidence"]
+            }}}
+        )
+        if res.matched_count == 0:
+            # Deleted mid-request: don't leave the consultation pointing at it
+            await db.get_consultations_collection().update_one(
+                {"_id": consultation_id}, {"$set": {"appointment_id": None}}
+            )
+            raise HTTPException(status_code=404, detail="Appointment not found")
     
     return {
+        "consultation_id": str(consultation_id),
+        "status": consultation["status"],
         "condition_detected": condition,
         "confidence": confidence,
         "ai_treatment_plan": med_plan
     }
 
+# --- Analytics (served from pre-aggregated rollups) ---
+@app.get("/api/analytics/conditions")
+async def analytics_conditions(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    ward: Optional[str] = None,
+    doctor_id: Optional[str] = None
+):
+    return await analytics.condition_summary(db, start, end, ward, doctor_id)
+
+@app.get("/api/analytics/confidence")
+async def analytics_confidence(condition: Optional[str] = None):
+    return await analytics.confidence_distribution(db, condition)
+
+@app.get("/api/analytics/severity-trend")
+async def analytics_severity_trend(start: Optional[str] = None, end: Optional[str] = None):
+    return await analytics.severity_trend(db, start, end)
+
+# --- CPU Scheduling ---
+@app.get("/api/admin/cpu-config")
+async def get_cpu_config():
+    return inference_scheduler.config()
+
+@app.post("/api/admin/cpu-autotune")
+async def run_cpu_autotune():
+    if not ai_service.model:
+        raise HTTPException(status_code=503, detail="AI model unavailable; nothing to tune")
+    try:
+        return await asyncio.to_thread(inference_scheduler.autotune, ai_service.predict_image)
+    except AutotuneInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 # Patient Symptom Checker
 @app.post("/api/patient/symptom-check")
 async def symptom_checker(symptoms: str = Body(..., embed=True)):
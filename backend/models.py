@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class UserLogin(BaseModel):
+    username: str
+    password: str
+
+class User(BaseModel):
+    id: Optional[str] = Field(None, alias="_id")
+    username: str
+    role: str # 'admin', 'doctor', 'patient'
+    linked_id: Optional[str] = None # ID in doctors/patients collection
+
+class Patient(BaseModel):
+    id: Optional[str] = Field(None, alias="_id")
+    name: str
+    age: int
+    gender: str
+    contact: str
+    weight: float
+    allergies: str = "None"
+    history: str = ""
+    severity: str = "Normal" # 'Normal', 'Serious', 'Critical'
+    assigned_bed_id: Optional[str] = None
+
+class Doctor(BaseModel):
+    id: Optional[str] = Field(None, alias="_id")
+    name: str
+    specialization: str
+    availability: str
+
+class Bed(BaseModel):
+    id: Optional[str] = Field(None, alias="_id")
+    ward: str
+    number: str
+    is_occupied: bool = False
+    patient_id: Optional[str] = None
+
+class Appointment(BaseModel):
+    id: Optional[str] = Field(None, alias="_id")
+    patient_id: str
+    doctor_id: str
+    date: str
+    status: str = "Scheduled"
+    ai_analysis_ref: Optional[dict] = None
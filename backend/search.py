@@ -0,0 +1,232 @@
+"""
+Patient search: indexed prefix lookup in MongoDB plus a typo-tolerant
+in-process trigram index.
+
+Prefix mode matches query tokens against the `search_keys` multikey index
+(lowercased tokens of name, contact and allergies). Fuzzy mode ranks patients
+by trigram overlap with the query using postings held in compact int arrays.
+
+Backfill `search_keys` on existing data with:
+    python -m backend.search --backfill
+"""
+import argparse
+import asyncio
+import re
+import time
+from array import array
+
+import numpy as np
+from pymongo import UpdateOne
+
+SEARCH_FIELDS = ["name", "contact", "allergies"]
+# Prefix hits are matched via the index and ranked inside Mongo; beyond this many
+# matches (e.g. common surnames, one-letter queries) ranking covers only the first
+# ones and the response is flagged `truncated`.
+MAX_PREFIX_CANDIDATES = 10000
+MIN_FUZZY_SCORE = 0.2
+BUILD_BATCH_SIZE = 10000
+BUILD_YIELD_EVERY = 500  # ~15ms of indexing between event loop turns
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Form defaults like allergies="None" would otherwise match nearly every patient
+PLACEHOLDER_VALUES = {"", "none", "n/a", "na", "nil", "-"}
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(str(text or "").lower())
+
+
+def field_text(patient, field):
+    value = str(patient.get(field) or "").strip()
+    return "" if value.lower() in PLACEHOLDER_VALUES else value
+
+
+def search_keys(patient):
+    """Lowercased, de-duplicated tokens stored on each patient for the prefix index."""
+    keys = []
+    for field in SEARCH_FIELDS:
+        keys.extend(tokenize(field_text(patient, field)))
+    # Also index the contact as one run of digits so "5550101" finds "555-0101"
+    digits = "".join(c for c in field_text(patient, "contact") if c.isdigit())
+    if digits:
+        keys.append(digits)
+    return sorted(set(keys))
+
+
+def trigrams(tokens):
+    grams = set()
+    for tok in tokens:
+        padded = f" {tok} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def _prefix_score(q_tokens):
+    """
+    Mongo expression ranking a match, summed per query token: exact name
+    token 3, name token prefix 2, exact token in another field 1.5, else 1.
+    """
+    name = {"$toLower": {"$ifNull": ["$name", ""]}}
+    per_token = []
+    for tok in q_tokens:
+        t = re.escape(tok)
+        per_token.append({"$switch": {
+            "branches": [
+                {"case": {"$regexMatch": {"input": name, "regex": f"(^|[^a-z0-9]){t}([^a-z0-9]|$)"}}, "then": 3},
+                {"case": {"$regexMatch": {"input": name, "regex": f"(^|[^a-z0-9]){t}"}}, "then": 2},
+                {"case": {"$in": [tok, {"$ifNull": ["$search_keys", []]}]}, "then": 1.5}
+            ],
+            "default": 1
+        }})
+    return {"$add": per_token}
+
+
+async def ensure_search_index(coll):
+    await coll.create_index("search_keys", name="search_keys_1")
+
+
+async def _has_more_than(coll, match, n):
+    """Probe: is there an (n+1)th match? Walks the index without scoring or sorting."""
+    return bool(await coll.find(match, {"_id": 1}).skip(n).limit(1).to_list(length=1))
+
+
+async def prefix_search(coll, query, skip=0, limit=20, projection=None):
+    """Returns (page, has_more, truncated); ranking and paging happen server-side."""
+    q_tokens = tokenize(query)
+    if not q_tokens:
+        return [], False, False
+    # Anchored, case-sensitive regexes on lowercased keys use index bounds
+    match = {"$and": [{"search_keys": {"$regex": f"^{re.escape(tok)}"}} for tok in q_tokens]}
+    # $sort + $skip + $limit coalesce into a top-k sort over the capped candidates
+    pipeline = [
+        {"$match": match},
+        {"$limit": MAX_PREFIX_CANDIDATES},
+        {"$addFields": {"score": _prefix_score(q_tokens)}},
+        {"$sort": {"score": -1, "name": 1, "_id": 1}},
+        {"$skip": skip},
+        {"$limit": limit + 1}
+    ]
+    if projection:
+        pipeline.append({"$project": {**projection, "score": 1}})
+    page, truncated = await asyncio.gather(
+        coll.aggregate(pipeline).to_list(length=limit + 1),
+        _has_more_than(coll, match, MAX_PREFIX_CANDIDATES)
+    )
+    return page[:limit], len(page) > limit, truncated
+
+
+class NGramIndex:
+    """
+    Append-only trigram index. Each document gets an integer slot; postings
+    are array('i') of slots per trigram, and scoring is a single numpy
+    bincount over the postings of the query's trigrams.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.gram_counts = array("H")
+        self.postings = {}
+        self.ready = False
+        self._indexed = None  # Ids indexed so far, tracked only while build() runs
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, doc_id, patient):
+        # During build() a new patient can reach the index from both the build
+        # cursor and the insert route, in either order; index it once.
+        if self._indexed is not None:
+            if doc_id in self._indexed:
+                return
+            self._indexed.add(doc_id)
+        grams = trigrams(tokenize(" ".join(field_text(patient, f) for f in SEARCH_FIELDS)))
+        slot = len(self.ids)
+        self.ids.append(doc_id)
+        self.gram_counts.append(min(len(grams), 65535))
+        for g in grams:
+            posting = self.postings.get(g)
+            if posting is None:
+                posting = self.postings[g] = array("i")
+            posting.append(slot)
+
+    async def build(self, coll, batch_size=BUILD_BATCH_SIZE, yield_every=BUILD_YIELD_EVERY):
+        """Streams the collection into the index; inserts arriving meanwhile are not duplicated."""
+        self._indexed = set(self.ids)
+        start = time.perf_counter()
+        projection = {f: 1 for f in SEARCH_FIELDS}
+        n = 0
+        try:
+            async for p in coll.find({}, projection).batch_size(batch_size):
+                self.add(p["_id"], p)
+                n += 1
+                if n % yield_every == 0:
+                    await asyncio.sleep(0)  # Keep request latency bounded during the build
+        finally:
+            self._indexed = None
+        self.ready = True
+        print(f"Patient search index built: {len(self)} patients in {time.perf_counter() - start:.1f}s")
+
+    def search(self, query, skip=0, limit=20, min_score=MIN_FUZZY_SCORE):
+        """Returns ([(doc_id, score)], has_more) ranked by trigram query coverage."""
+        q_grams = trigrams(tokenize(query))
+        lists = [self.postings[g] for g in q_grams if g in self.postings]
+        if not lists:
+            return [], False
+        slots = np.concatenate([np.frombuffer(p, dtype=np.int32) for p in lists])
+        shared = np.bincount(slots, minlength=len(self.ids))
+        sizes = np.frombuffer(self.gram_counts, dtype=np.uint16)[:len(shared)]
+        # Rank by how much of the query a patient covers, then by Dice so
+        # tighter matches (fewer unrelated trigrams) come first.
+        coverage = shared / len(q_grams)
+        hits = np.flatnonzero(coverage >= min_score)
+        scores = coverage[hits] + 1e-3 * (2.0 * shared[hits] / (len(q_grams) + sizes[hits]))
+        want = skip + limit + 1
+        if len(hits) > want:
+            top = np.argpartition(-scores, want - 1)[:want]
+            hits, scores = hits[top], scores[top]
+        order = np.lexsort((hits, -scores))
+        hits, scores = hits[order], scores[order]
+        page = hits[skip:skip + limit]
+        return [(self.ids[i], float(sc)) for i, sc in zip(page, scores[skip:skip + limit])], len(hits) > skip + limit
+
+
+patient_search = NGramIndex()
+
+
+async def backfill_search_keys(coll, batch_size=BUILD_BATCH_SIZE, only_missing=True):
+    """Writes `search_keys` (to patients missing it, or all) in streaming bulk batches."""
+    ops, total = [], 0
+    projection = {f: 1 for f in SEARCH_FIELDS}
+    query = {"search_keys": {"$exists": False}} if only_missing else {}
+    async for p in coll.find(query, projection).batch_size(batch_size):
+        ops.append(UpdateOne({"_id": p["_id"]}, {"$set": {"search_keys": search_keys(p)}}))
+        if len(ops) >= batch_size:
+            await coll.bulk_write(ops, ordered=False)
+            total += len(ops)
+            ops = []
+    if ops:
+        await coll.bulk_write(ops, ordered=False)
+        total += len(ops)
+    return total
+
+
+async def _main(args):
+    from backend.database import db
+    await db.connect_async()
+    try:
+        coll = db.get_patients_collection()
+        await ensure_search_index(coll)
+        if args.backfill:
+            n = await backfill_search_keys(coll, args.batch_size, only_missing=not args.all)
+            print(f"Backfilled search_keys on {n} patients.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the patient search index.")
+    parser.add_argument("--backfill", action="store_true", help="Populate search_keys on existing patients")
+    parser.add_argument("--all", action="store_true", help="With --backfill, recompute search_keys on every patient")
+    parser.add_argument("--batch-size", type=int, default=BUILD_BATCH_SIZE)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from backend.search import search_keys
+
+# Default accounts/records created on first boot
+DEFAULT_USERS = [
+    {"username": "admin", "password": "admin123", "role": "admin"},
+    {"username": "doctor", "password": "doc123", "role": "doctor", "linked_id": "doc_1"},
+    {"username": "patient", "password": "pat123", "role": "patient", "linked_id": "pat_1"}
+]
+DEFAULT_DOCTORS = [
+    {"_id": "doc_1", "name": "Dr. Smith", "specialization": "General", "availability": "Mon-Fri"}
+]
+DEFAULT_PATIENTS = [
+    {"_id": "pat_1", "name": "John Doe", "age": 30, "gender": "Male", "contact": "555-0101", "weight": 75.0, "allergies": "None", "severity": "Normal"}
+]
+DEFAULT_BEDS = [
+    {"ward": "General" if i <= 15 else "ICU", "number": f"B-{i:02d}", "is_occupied": False, "patient_id": None}
+    for i in range(1, 21) # 20 Beds
+]
+SEED_STATE = "app_meta"
+SEED_MARKER = {"_id": "default_seed"}
+
+def upsert_ops(docs, key_fields):
+    """
+    Builds one insert-if-missing upsert per document, matched on `key_fields`.
+    Existing documents are never modified, so re-running is a no-op.
+    """
+    ops = []
+    for doc in docs:
+        key = {k: doc[k] for k in key_fields}
+        # Equality fields in the filter are copied into the inserted doc by Mongo
+        rest = {k: v for k, v in doc.items() if k not in key}
+        ops.append(UpdateOne(key, {"$setOnInsert": rest}, upsert=True))
+    return ops
+
+async def seed_defaults(database):
+    """
+    Seeds default users, doctor, patient and beds on first boot only (one bulk
+    upsert per collection), then records a marker so records an operator later
+    deletes or renames are never recreated.
+    """
+    state = database.db[SEED_STATE]
+    if await state.find_one(SEED_MARKER):
+        return 0
+    users = database.get_users_collection()
+    beds = database.get_beds_collection()
+    plan = []
+    # Databases seeded before the marker existed: an existing user or bed means
+    # that group was already seeded; users go last so they imply doctor/patient
+    if not await users.find_one({}, {"_id": 1}):
+        plan += [
+            (database.get_doctors_collection(), upsert_ops(DEFAULT_DOCTORS, ["_id"])),
+            (database.get_patients_collection(), upsert_ops([{**p, "search_keys": search_keys(p)} for p in DEFAULT_PATIENTS], ["_id"])),
+            (users, upsert_ops(DEFAULT_USERS, ["username"])),
+        ]
+    if not await beds.find_one({}, {"_id": 1}):
+        plan.append((beds, upsert_ops(DEFAULT_BEDS, ["number"])))
+    inserted = 0
+    for coll, ops in plan:
+        res = await coll.bulk_write(ops, ordered=False)
+        inserted += res.upserted_count
+    await state.update_one(SEED_MARKER, {"$setOnInsert": {"seeded_at": datetime.now(timezone.utc)}}, upsert=True)
+    if inserted:
+        print(f"Seeded {inserted} default records.")
+    return inserted
@@ -0,0 +1,79 @@
+"""
+Shared JSON serialization for API responses.
+
+Mongo documents are rendered directly with orjson: ObjectId (and any other
+BSON type) is converted inside the encoder's single pass, so routes can
+return raw cursor results without copying documents or stringifying `_id`
+in a Python loop. Returning `MongoJSONResponse(...)` from a route also skips
+FastAPI's jsonable_encoder and response_model re-validation, which is only
+worthwhile for data the server itself just read from the database; use
+model_pipeline() to read it in the model's shape.
+"""
+import json
+from datetime import date, datetime
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Fall back to stdlib json; same output, slower
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content):
+    if orjson:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class MongoJSONResponse(JSONResponse):
+    """JSON response that encodes BSON types natively (app-wide default response class)."""
+
+    def render(self, content):
+        return dumps(content)
+
+
+def _annotation(field):
+    return getattr(field, "annotation", None) or getattr(field, "outer_type_", None)
+
+
+def _is_required(field):
+    required = getattr(field, "is_required", None)
+    return required() if callable(required) else bool(getattr(field, "required", True))
+
+
+def projection_for(model):
+    """
+    Aggregation $project spec shaped like a Pydantic model: only its fields,
+    defaults filled in for missing keys and floats coerced, i.e. what
+    response_model used to do, computed by Mongo instead of per document in Python.
+    """
+    fields = getattr(model, "model_fields", None) or model.__fields__
+    spec = {}
+    for name, field in fields.items():
+        key = field.alias or name
+        value = 1
+        if key != "_id":
+            if _annotation(field) is float:
+                value = {"$add": [f"${key}", 0.0]}
+            if not _is_required(field):
+                value = {"$ifNull": [f"${key}" if value == 1 else value, {"$literal": field.default}]}
+        spec[key] = value
+    return spec
+
+
+def model_pipeline(model, query=None):
+    """Pipeline returning documents matching `query` in the shape of `model`."""
+    return [{"$match": query or {}}, {"$project": projection_for(model)}]
@@ -0,0 +1,92 @@
+"""
+Patient search latency at scale.
+
+Builds the in-process trigram index over synthetic patients and reports
+p50/p95/p99 fuzzy query latency. With --mongo, also times prefix queries
+against the `search_keys` index (patients must already be generated with
+`python -m backend.data_generator`).
+
+Targets at 1,000,000 patients: fuzzy p95 < 100ms, prefix p95 < 20ms.
+
+    python -m benchmarks.bench_search --patients 1000000
+    python -m benchmarks.bench_search --mongo
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from backend.data_generator import DatasetGenerator
+from backend.search import NGramIndex, ensure_search_index, prefix_search
+
+QUERIES = ["john smith", "jonh smtih", "patel", "ptel", "penicillin", "penicilin", "555-01", "maria garcia", "kenji", "ivanova"]
+
+
+class IndexWriter:
+    """Feeds generated patients straight into an NGramIndex instead of a database."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def write(self, collection, docs):
+        if collection == "patients":
+            for d in docs:
+                self.index.add(d["_id"], d)
+
+    def close(self):
+        pass
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {"p50": statistics.median(samples), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def report(label, samples):
+    p = percentiles(samples)
+    print(f"{label:<10} p50={p['p50']:.2f}ms p95={p['p95']:.2f}ms p99={p['p99']:.2f}ms ({len(samples)} queries)")
+
+
+def bench_fuzzy(n, rounds):
+    index = NGramIndex()
+    start = time.perf_counter()
+    DatasetGenerator(IndexWriter(index), seed=42, appointments_per_patient=0).run(n, 0, 0)
+    print(f"Indexed {len(index)} patients in {time.perf_counter() - start:.1f}s")
+
+    samples = []
+    for _ in range(rounds):
+        for q in QUERIES:
+            t = time.perf_counter()
+            index.search(q, 0, 20)
+            samples.append((time.perf_counter() - t) * 1000)
+    report("fuzzy", samples)
+
+
+async def bench_prefix(rounds):
+    from backend.database import db
+    await db.connect_async()
+    try:
+        coll = db.get_patients_collection()
+        await ensure_search_index(coll)
+        samples = []
+        for _ in range(rounds):
+            for q in QUERIES:
+                t = time.perf_counter()
+                await prefix_search(coll, q, 0, 20)
+                samples.append((time.perf_counter() - t) * 1000)
+        report("prefix", samples)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark patient search latency.")
+    parser.add_argument("--patients", type=int, default=1000000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--mongo", action="store_true", help="Benchmark prefix search against MongoDB instead")
+    args = parser.parse_args()
+    if args.mongo:
+        asyncio.run(bench_prefix(args.rounds))
+    else:
+        bench_fuzzy(args.patients, args.rounds)
@@ -0,0 +1,112 @@
+"""
+End-to-end cost of listing 10k patients, before and after the shared
+serialization layer: read from a collection, shape, serialize.
+
+    before  find() -> copy loop with str(_id) -> response_model validation
+            and dump -> stdlib json (FastAPI's default JSONResponse path)
+    after   aggregate(model_pipeline(Patient)), shaped by the database
+            -> MongoJSONResponse (orjson, ObjectId in-encoder)
+
+Runs against mongomock by default, whose aggregation is emulated in Python
+and so overstates the cost of `$project`; use --mongo for a real server
+(a scratch collection is created and dropped).
+
+    python -m benchmarks.bench_serialization --docs 10000 --rounds 20
+    python -m benchmarks.bench_serialization --mongo
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+from backend.data_generator import DatasetGenerator
+from backend.models import Patient
+from backend.serialization import MongoJSONResponse, model_pipeline
+
+PATIENTS = TypeAdapter(List[Patient])
+SCRATCH = "bench_serialization_patients"
+
+
+class ListWriter:
+    def __init__(self):
+        self.docs = {}
+
+    def write(self, collection, docs):
+        self.docs.setdefault(collection, []).extend(dict(d) for d in docs)
+
+    def close(self):
+        pass
+
+
+def patient_docs(n):
+    writer = ListWriter()
+    DatasetGenerator(writer, seed=42, appointments_per_patient=0).run(n, 0, 0)
+    return writer.docs["patients"]
+
+
+async def before(coll):
+    """Returns (body, ms spent reading from the collection)."""
+    t = time.perf_counter()
+    docs = await coll.find().to_list(length=None)
+    read_ms = (time.perf_counter() - t) * 1000
+    patients = []
+    for p in docs:
+        p["_id"] = str(p["_id"])
+        patients.append(p)
+    # What FastAPI does for response_model under Pydantic v2: validate, then dump
+    validated = PATIENTS.validate_python(patients)
+    content = PATIENTS.dump_python(validated, mode="json", by_alias=True)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8"), read_ms
+
+
+async def after(coll):
+    """Returns (body, ms spent reading from the collection, shaping included)."""
+    t = time.perf_counter()
+    docs = await coll.aggregate(model_pipeline(Patient)).to_list(length=None)
+    read_ms = (time.perf_counter() - t) * 1000
+    return MongoJSONResponse(docs).body, read_ms
+
+
+async def timeit(fn, coll, rounds):
+    """Median (total ms, read ms) over `rounds` runs."""
+    totals, reads = [], []
+    for _ in range(rounds):
+        t = time.perf_counter()
+        _, read_ms = await fn(coll)
+        totals.append((time.perf_counter() - t) * 1000)
+        reads.append(read_ms)
+    return statistics.median(totals), statistics.median(reads)
+
+
+async def main(args):
+    if args.mongo:
+        from backend.database import db
+        await db.connect_async()
+        database, close = db.db, db.close
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        database, close = AsyncMongoMockClient()["bench"], lambda: None
+    coll = database[SCRATCH]
+    try:
+        await coll.drop()
+        await coll.insert_many(patient_docs(args.docs))
+        t_before = await timeit(before, coll, args.rounds)
+        t_after = await timeit(after, coll, args.rounds)
+    finally:
+        await coll.drop()
+        close()
+    for label, (total, read) in (("before", t_before), ("after", t_after)):
+        print(f"{label + ':':<7} {total:.1f}ms per {args.docs} docs ({read:.1f}ms reading, {total - read:.1f}ms in Python after the read)")
+    print(f"speedup: {t_before[0] / t_after[0]:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API response serialization.")
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--mongo", action="store_true", help="Read from MongoDB instead of mongomock")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,13 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from backend.database import Database
+
+
+@pytest.fixture
+def database():
+    """A Database wired to an in-memory Mongo stand-in."""
+    d = Database()
+    d.client = AsyncMongoMockClient()
+    d.db = d.client["test_hospital_db"]
+    return d
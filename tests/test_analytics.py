@@ -0,0 +1,108 @@
+import asyncio
+
+from backend import analytics
+from backend.analytics import (
+    ROLLUPS, build_consultation, condition_summary, confidence_distribution,
+    record_consultation, recompute_rollups, rollup_ops, severity_trend
+)
+
+
+def _consultation(condition="Viral Pneumonia", confidence="92.34%", severity="Serious", ward="ICU", doctor_id="doc_1"):
+    return build_consultation("pat_1", doctor_id, None, {"severity": severity}, ward, condition, confidence, "plan")
+
+
+def _record(database, *consultations):
+    for c in consultations:
+        asyncio.run(record_consultation(database, c))
+
+
+def test_rollup_ops_merges_a_batch_into_one_upsert_per_rollup():
+    ops = rollup_ops([_consultation(confidence="90.5%"), _consultation(confidence="91.5%")])
+    by_id = {op._filter["_id"]: op._doc["$inc"] for op in ops}
+
+    assert len(ops) == 4  # one condition, two confidence buckets, one severity
+    condition = next(v for k, v in by_id.items() if k.startswith("condition|"))
+    assert condition == {"count": 2, "confidence_sum": 182.0}
+
+
+def test_condition_counts_and_averages(database):
+    _record(database, _consultation(confidence="92.34%"), _consultation(confidence="87.66%"),
+            _consultation(condition="Hernia", confidence="95%", doctor_id="doc_2"))
+
+    summary = asyncio.run(condition_summary(database))
+    assert summary == [
+        {"condition": "Viral Pneumonia", "count": 2, "avg_confidence": 90.0},
+        {"condition": "Hernia", "count": 1, "avg_confidence": 95.0}
+    ]
+    assert asyncio.run(condition_summary(database, doctor_id="doc_2")) == [
+        {"condition": "Hernia", "count": 1, "avg_confidence": 95.0}
+    ]
+    assert asyncio.run(confidence_distribution(database, "Viral Pneumonia")) == [
+        {"bucket": "87-88%", "count": 1}, {"bucket": "92-93%", "count": 1}
+    ]
+
+
+def test_failed_inferences_are_stored_but_not_rolled_up(database):
+    _record(database, _consultation(confidence="92.34%"),
+            _consultation(condition="AI Model Unavailable", confidence="0%"),
+            _consultation(condition="Analysis Failed", confidence="0%"))
+
+    summary = asyncio.run(condition_summary(database))
+    assert summary == [{"condition": "Viral Pneumonia", "count": 1, "avg_confidence": 92.34}]
+    assert asyncio.run(confidence_distribution(database)) == [{"bucket": "92-93%", "count": 1}]
+    assert asyncio.run(database.get_consultations_collection().count_documents({"status": "failed"})) == 2
+
+
+def test_recompute_matches_incremental_rollups(database):
+    _record(database, _consultation(), _consultation(severity="Critical"),
+            _consultation(condition="Hernia", confidence="88%"),
+            _consultation(condition="Analysis Failed", confidence="0%"))
+    rollups = database.db[ROLLUPS]
+    before = sorted(asyncio.run(rollups.find({}).to_list(None)), key=lambda r: r["_id"])
+
+    asyncio.run(rollups.update_many({}, {"$inc": {"count": 100}}))  # Corrupt, then rebuild
+    assert asyncio.run(recompute_rollups(database, batch_size=2)) == 3
+
+    after = sorted(asyncio.run(rollups.find({}).to_list(None)), key=lambda r: r["_id"])
+    assert after == before
+    assert {"Serious", "Critical"} <= set(asyncio.run(severity_trend(database))[0])
+
+
+def test_recompute_replays_consultations_recorded_during_rebuild(database, monkeypatch):
+    _record(database, _consultation())
+    stream = analytics._stream_rollups
+    calls = []
+
+    async def stream_then_record(db, target, query, batch_size):
+        n = await stream(db, target, query, batch_size)
+        if not calls:  # A live consultation lands after the history pass
+            await record_consultation(db, _consultation(condition="Hernia", confidence="90%"))
+        calls.append(query)
+        return n
+
+    monkeypatch.setattr(analytics, "_stream_rollups", stream_then_record)
+    asyncio.run(recompute_rollups(database))
+
+    counts = {s["condition"]: s["count"] for s in asyncio.run(condition_summary(database))}
+    assert counts == {"Viral Pneumonia": 1, "Hernia": 1}
+
+
+def test_recompute_does_not_replay_pending_live_writes(database, monkeypatch):
+    _record(database, _consultation())
+    stream = analytics._stream_rollups
+    pending = []
+
+    async def stream_then_insert(db, target, query, batch_size):
+        n = await stream(db, target, query, batch_size)
+        if not pending:  # Inserted before the swap; its rollup write lands after the rename
+            c = _consultation(condition="Hernia", confidence="90%")
+            await db.get_consultations_collection().insert_one(c)
+            pending.append(c)
+        return n
+
+    monkeypatch.setattr(analytics, "_stream_rollups", stream_then_insert)
+    asyncio.run(recompute_rollups(database))
+    asyncio.run(database.db[ROLLUPS].bulk_write(rollup_ops(pending), ordered=False))
+
+    counts = {s["condition"]: s["count"] for s in asyncio.run(condition_summary(database))}
+    assert counts == {"Viral Pneumonia": 1, "Hernia": 1}
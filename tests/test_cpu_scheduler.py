@@ -0,0 +1,84 @@
+import asyncio
+import importlib.util
+import sys
+import threading
+import types
+
+import pytest
+
+if importlib.util.find_spec("torch") is None:
+    # The scheduler only touches torch's thread-count knobs; stand in for them
+    fake_torch = types.ModuleType("torch")
+    fake_torch.set_num_threads = lambda n: None
+    fake_torch.set_num_interop_threads = lambda n: None
+    fake_torch.get_num_interop_threads = lambda: 1
+    sys.modules["torch"] = fake_torch
+
+from backend import cpu_scheduler
+from backend.cpu_scheduler import AutotuneInProgress, InferenceScheduler, candidate_layouts, default_layout
+
+
+@pytest.mark.parametrize("cores, layout", [(8, (7, 1)), (6, (5, 1)), (9, (2, 4)), (7, (2, 3)), (2, (1, 1))])
+def test_default_layout_fills_inference_cores(monkeypatch, cores, layout):
+    monkeypatch.setattr(cpu_scheduler.os, "cpu_count", lambda: cores)
+    for var in ("REQUEST_CORES", "INFERENCE_WORKERS", "TORCH_THREADS"):
+        monkeypatch.delenv(var, raising=False)
+
+    scheduler = InferenceScheduler()
+    try:
+        assert (scheduler.workers, scheduler.threads) == layout
+        assert scheduler.workers * scheduler.threads == scheduler.inference_cores == cores - 1
+        assert all(w * t == cores - 1 for w, t in candidate_layouts(cores - 1))
+    finally:
+        scheduler.shutdown()
+
+
+def test_default_layout_derives_the_unset_half():
+    assert default_layout(8, threads=2) == (4, 2)
+    assert default_layout(8, workers=3) == (3, 2)
+    assert default_layout(8, workers=3, threads=3) == (3, 3)
+
+
+def test_concurrent_autotune_is_rejected():
+    scheduler = InferenceScheduler()
+    started, release = threading.Event(), threading.Event()
+
+    def slow_inference(_):
+        started.set()
+        release.wait(5)
+
+    sweep = threading.Thread(target=scheduler.autotune, args=(slow_inference, 1))
+    sweep.start()
+    try:
+        assert started.wait(5)
+        assert scheduler.config()["autotune_running"]
+        with pytest.raises(AutotuneInProgress):
+            scheduler.autotune(slow_inference, 1)
+    finally:
+        release.set()
+        sweep.join()
+    assert scheduler.last_autotune["selected"]
+    scheduler.shutdown()
+
+
+def test_run_survives_concurrent_reconfiguration():
+    scheduler = InferenceScheduler()
+    stop = threading.Event()
+
+    def reconfigure():
+        i = 0
+        while not stop.is_set():
+            scheduler.configure(1 + i % 2, 1)
+            i += 1
+
+    async def main():
+        return await asyncio.gather(*(scheduler.run(lambda x: x, i) for i in range(300)))
+
+    swapper = threading.Thread(target=reconfigure)
+    swapper.start()
+    try:
+        assert asyncio.run(main()) == list(range(300))
+    finally:
+        stop.set()
+        swapper.join()
+    scheduler.shutdown()
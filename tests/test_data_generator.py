@@ -0,0 +1,42 @@
+import pytest
+
+from backend.data_generator import DatasetGenerator, JsonlWriter
+
+
+class ListWriter:
+    def __init__(self):
+        self.docs = {}
+
+    def write(self, collection, docs):
+        self.docs.setdefault(collection, []).extend(dict(d) for d in docs)
+
+    def close(self):
+        pass
+
+
+def test_severity_wards_occupy_configured_wards():
+    writer = ListWriter()
+    gen = DatasetGenerator(
+        writer, seed=1, appointments_per_patient=0,
+        severity_mix={"Serious": 1.0}, ward_mix={"General": 0.5, "Maternity": 0.5},
+        severity_wards={"Serious": ["Maternity"]}
+    )
+    gen.run(200, 0, 40)
+
+    occupied = {b["ward"] for b in writer.docs["beds"] if b["is_occupied"]}
+    assert occupied == {"Maternity"}
+
+
+def test_severity_wards_must_exist_in_ward_mix():
+    with pytest.raises(ValueError):
+        DatasetGenerator(ListWriter(), ward_mix={"General": 1.0}, severity_wards={"Critical": ["ICU"]})
+
+
+def test_jsonl_writer_refuses_existing_output_without_drop(tmp_path):
+    writer = JsonlWriter(str(tmp_path))
+    writer.write("patients", [{"_id": 1}])
+    writer.close()
+
+    with pytest.raises(RuntimeError):
+        JsonlWriter(str(tmp_path))
+    JsonlWriter(str(tmp_path), drop=True).close()
@@ -0,0 +1,125 @@
+import asyncio
+
+from backend import search
+from backend.search import NGramIndex, prefix_search, search_keys, trigrams
+
+
+def _patient(name, contact="555-0000", allergies="None"):
+    p = {"name": name, "contact": contact, "allergies": allergies}
+    p["search_keys"] = search_keys(p)
+    return p
+
+
+def _seed(database, patients):
+    coll = database.get_patients_collection()
+    asyncio.run(coll.insert_many(patients))
+    return coll
+
+
+def test_search_keys_skip_placeholders():
+    keys = search_keys({"name": "Jane Roe", "contact": "555-0101", "allergies": "None"})
+    assert "none" not in keys
+    assert keys == sorted({"jane", "roe", "555", "0101", "5550101"})
+    assert not trigrams(search.tokenize(search.field_text({"allergies": " none "}, "allergies")))
+
+
+def test_prefix_ranks_exact_name_matches_across_all_hits(database):
+    coll = _seed(database, [_patient(f"Alex Smith{i:04d}") for i in range(900)] +
+                 [_patient("John Smith") for _ in range(100)])
+
+    page, has_more, truncated = asyncio.run(prefix_search(coll, "smith", 0, 20))
+    assert [p["name"] for p in page] == ["John Smith"] * 20
+    assert has_more and not truncated
+
+    page, has_more, _ = asyncio.run(prefix_search(coll, "smith", 500, 20))
+    assert len(page) == 20 and has_more
+    assert all(p["name"].startswith("Alex Smith") for p in page)
+
+    page, has_more, _ = asyncio.run(prefix_search(coll, "smith", 980, 20))
+    assert len(page) == 20 and not has_more
+
+
+def test_prefix_pages_do_not_overlap(database):
+    coll = _seed(database, [_patient(f"Pat Smith{i:03d}") for i in range(45)])
+    seen = []
+    for skip in (0, 20, 40):
+        page, _, _ = asyncio.run(prefix_search(coll, "pat smi", skip, 20))
+        seen.extend(p["_id"] for p in page)
+    assert len(seen) == len(set(seen)) == 45
+
+
+def test_prefix_prefers_name_over_other_fields(database):
+    coll = _seed(database, [_patient("Mary Jones", allergies="Penicillin"), _patient("Penny Lane")])
+    page, _, _ = asyncio.run(prefix_search(coll, "pen", 0, 10))
+    assert [p["name"] for p in page] == ["Penny Lane", "Mary Jones"]
+
+
+def test_prefix_none_placeholder_does_not_match(database):
+    coll = _seed(database, [_patient("Jane Roe"), _patient("Nora Vale")])
+    page, _, _ = asyncio.run(prefix_search(coll, "no", 0, 10))
+    assert [p["name"] for p in page] == ["Nora Vale"]
+
+
+def test_prefix_reports_truncation(database, monkeypatch):
+    monkeypatch.setattr(search, "MAX_PREFIX_CANDIDATES", 10)
+    coll = _seed(database, [_patient(f"Sam Smith{i}") for i in range(25)])
+    page, has_more, truncated = asyncio.run(prefix_search(coll, "smith", 0, 5))
+    assert len(page) == 5 and has_more and truncated
+
+    page, _, truncated = asyncio.run(prefix_search(coll, "smith2", 0, 10))
+    assert len(page) == 6 and not truncated  # Smith2, Smith20..24
+
+
+def test_fuzzy_finds_typos_and_paginates():
+    index = NGramIndex()
+    names = ["Penelope Cruz", "Peter Parker", "Mary Patel", "Wei Patel", "John Smith"]
+    for i, name in enumerate(names):
+        index.add(i, {"name": name, "contact": f"555-{i:04d}", "allergies": "None"})
+
+    hits, _ = index.search("ptel", 0, 10)
+    assert {names[i] for i, _ in hits[:2]} == {"Mary Patel", "Wei Patel"}
+
+    hits, _ = index.search("penelpoe", 0, 1)
+    assert names[hits[0][0]] == "Penelope Cruz"
+
+    first, has_more = index.search("patel", 0, 1)
+    second, _ = index.search("patel", 1, 1)
+    assert has_more and first[0][0] != second[0][0]
+
+
+def test_fuzzy_ignores_placeholder_allergies():
+    index = NGramIndex()
+    index.add(1, {"name": "Jane Roe", "contact": "", "allergies": "None"})
+    assert " no" not in index.postings and "non" not in index.postings
+    assert index.gram_counts[0] == len(trigrams(["jane", "roe"]))
+
+
+class _RacingPatients:
+    """Build cursor over `docs`; the insert route indexes `racer` right after the cursor reads it."""
+
+    def __init__(self, index, docs, racer):
+        self.index, self.docs, self.racer = index, docs, racer
+
+    def find(self, query, projection):
+        return self
+
+    def batch_size(self, n):
+        return self._iter()
+
+    async def _iter(self):
+        for d in self.docs:
+            yield d
+            if d["_id"] == self.racer:
+                self.index.add(d["_id"], d)
+
+
+def test_build_does_not_double_index_racing_inserts():
+    docs = [{"_id": i, **_patient(f"Pat {i}")} for i in range(1200)]
+    index = NGramIndex()
+    index.add(1199, docs[1199])  # Inserted before the build cursor reaches it
+
+    asyncio.run(index.build(_RacingPatients(index, docs, racer=5), yield_every=100))
+
+    assert index.ready
+    assert len(index) == 1200
+    assert index.ids.count(5) == 1 and index.ids.count(1199) == 1
@@ -0,0 +1,41 @@
+import asyncio
+
+from backend.seeding import DEFAULT_BEDS, DEFAULT_USERS, seed_defaults
+
+
+def test_seed_defaults_is_idempotent(database):
+    first = asyncio.run(seed_defaults(database))
+    second = asyncio.run(seed_defaults(database))
+
+    assert first == len(DEFAULT_USERS) + len(DEFAULT_BEDS) + 2  # + default doctor and patient
+    assert second == 0
+    assert asyncio.run(database.get_users_collection().count_documents({})) == len(DEFAULT_USERS)
+    assert asyncio.run(database.get_beds_collection().count_documents({})) == len(DEFAULT_BEDS)
+
+
+def test_seed_defaults_keeps_existing_records(database):
+    asyncio.run(database.get_users_collection().insert_one({"username": "admin", "password": "changed", "role": "admin"}))
+
+    asyncio.run(seed_defaults(database))
+
+    admin = asyncio.run(database.get_users_collection().find_one({"username": "admin"}))
+    assert admin["password"] == "changed"
+
+
+def test_deleted_admin_stays_deleted(database):
+    users = database.get_users_collection()
+    asyncio.run(seed_defaults(database))
+    asyncio.run(users.delete_one({"username": "admin"}))
+
+    assert asyncio.run(seed_defaults(database)) == 0
+    assert asyncio.run(seed_defaults(database)) == 0
+    assert asyncio.run(users.find_one({"username": "admin"})) is None
+
+
+def test_existing_deployment_is_not_reseeded(database):
+    # Seeded before the marker existed, then the operator removed the default admin
+    asyncio.run(database.get_users_collection().insert_one({"username": "ops", "password": "x", "role": "admin"}))
+    asyncio.run(database.get_beds_collection().insert_one({"ward": "ICU", "number": "ICU-1", "is_occupied": False}))
+
+    assert asyncio.run(seed_defaults(database)) == 0
+    assert asyncio.run(database.get_users_collection().find_one({"username": "admin"})) is None
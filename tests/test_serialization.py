@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from bson import ObjectId
+
+from backend.models import Appointment, Patient
+from backend.serialization import MongoJSONResponse, model_pipeline
+
+
+def _render(docs):
+    return json.loads(MongoJSONResponse(docs).body)
+
+
+def _response_model_output(model, docs):
+    """What FastAPI's response_model produced before the fast path."""
+    return [json.loads(model(**{**d, "_id": str(d["_id"])}).model_dump_json(by_alias=True)) for d in docs]
+
+
+def test_model_pipeline_matches_response_model_output(database):
+    coll = database.get_patients_collection()
+    docs = [
+        {"_id": "pat_1", "name": "John Doe", "age": 30, "gender": "Male", "contact": "555-0101", "weight": 75, "allergies": "None", "severity": "Normal"},
+        {"_id": ObjectId(), "name": "Jane Roe", "age": 40, "gender": "F", "contact": "555-2222", "weight": 60.5,
+         "allergies": "Penicillin", "history": "Asthma", "severity": "Critical", "assigned_bed_id": "b1",
+         "search_keys": ["jane", "roe"], "synthetic": True}
+    ]
+    asyncio.run(coll.insert_many([dict(d) for d in docs]))
+
+    rendered = _render(asyncio.run(coll.aggregate(model_pipeline(Patient)).to_list(None)))
+
+    assert rendered == _response_model_output(Patient, docs)
+    assert rendered[0]["history"] == "" and rendered[0]["assigned_bed_id"] is None
+    assert isinstance(rendered[0]["weight"], float)
+
+
+def test_model_pipeline_filters_and_drops_internal_fields(database):
+    coll = database.get_appointments_collection()
+    asyncio.run(coll.insert_many([
+        {"patient_id": "pat_1", "doctor_id": "doc_1", "date": "2026-10-19", "synthetic": True},
+        {"patient_id": "pat_2", "doctor_id": "doc_1", "date": "2026-10-20", "status": "Completed"}
+    ]))
+
+    rendered = _render(asyncio.run(coll.aggregate(model_pipeline(Appointment, {"patient_id": "pat_1"})).to_list(None)))
+
+    assert len(rendered) == 1
+    assert set(rendered[0]) == {"_id", "patient_id", "doctor_id", "date", "status", "ai_analysis_ref"}
+    assert rendered[0]["status"] == "Scheduled"
+
+
+def test_object_ids_are_encoded_in_nested_documents():
+    oid = ObjectId()
+    assert _render({"_id": oid, "refs": [oid], "doc": {"id": oid}}) == {"_id": str(oid), "refs": [str(oid)], "doc": {"id": str(oid)}}